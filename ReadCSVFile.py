@@ -1,16 +1,68 @@
+import numpy as np
 import pandas as pd
 import os
+import sys
+import time
 import pytz
 import re
-from dateutil.parser import parse
-from typing import Callable, Optional
+import multiprocessing
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Callable, Iterator, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; it is required only for use_arrow=True
+    pa = None
+    pa_csv = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # without numba the dedup row hashing uses the NumPy version below
+    njit = None
+
+# Arrow-backed strings let .str methods run on packed buffers instead of Python objects
+STRING_DTYPE = "string[pyarrow]" if pa is not None else "string"
+
+# Rule cells are compared with all whitespace removed
+_WS_RE = re.compile(r'\s+')
+
+# Column names and dtypes of a chunk -> (string columns, has price and quantity), see _chunk_layout
+_CHUNK_LAYOUT_CACHE = {}
+
+RULES_FILE_PATH = 'C:\\Vincent\\Asset Project Learning - python\\CSVs\\Rules\\Rules.csv'
+
+# FxHash multiplier used to fold the per-column hashes of a dedup key into one per row
+FXHASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# 'auto' dedup samples this many rows and picks sort when under this share of them are duplicates
+DEDUP_SAMPLE_ROWS = 10_000
+SORT_DEDUP_MAX_DUPLICATE_RATE = 0.05
+
+# Minimum time between "Processed N rows..." progress lines
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Arrow reads in byte-sized blocks rather than rows; rough size of one CSV row
+ARROW_BYTES_PER_ROW = 64
+
+# infer_narrow_dtypes picks one integer size above what the sample needs, as headroom for later chunks
+_WIDER_INT_DTYPE = {'int8': 'int16', 'int16': 'int32', 'int32': 'int64', 'int64': 'int64'}
+
+# Columns multiplied in data_transformation; never narrowed, a narrow product would overflow
+ARITHMETIC_COLUMNS = ('price', 'quantity')
 
 def process_csv_in_chunks(
     input_file: str,
     output_file: str,
     transform_function: Callable[[pd.DataFrame], pd.DataFrame],
     chunk_size: int = 50000,
-    write_header: bool = True
+    write_header: bool = True,
+    use_arrow: bool = False,
+    dtype_map: Optional[dict] = None,
+    max_workers: int = 1,
+    dedup_strategy: str = 'hash'
 ) -> None:
     """
     Process a large CSV file in chunks to avoid memory issues.
@@ -21,8 +73,23 @@ def process_csv_in_chunks(
         transform_function: Function to apply transformations to each chunk
         chunk_size: Number of rows to process at once
         write_header: Whether to write header to output file
+        use_arrow: Read and write CSV with PyArrow's streaming reader/writer instead of pandas.
+            The output holds the same data but is formatted by Arrow: text values and the header
+            are always quoted, and whole floats are written without ".0" (86 instead of 86.0).
+            Column types are fixed by the first block Arrow reads: a later value that doesn't fit
+            (e.g. "unknown" in a column of ints) raises ArrowInvalid. Give such columns an entry
+            in dtype_map, e.g. {'Age': str}, and let the transform convert them
+        dtype_map: Column name -> dtype to read with, e.g. from infer_narrow_dtypes
+        max_workers: Number of processes transforming chunks in parallel (e.g. os.cpu_count()); 1 runs in-process
+        dedup_strategy: 'hash' (seen-set), 'sort' (one np.unique over all key hashes instead of a growing
+            seen-set, but transforms the input twice) or 'auto' (sort when a sample has almost no duplicates)
     """
     
+    if use_arrow and pa is None:
+        raise ImportError("use_arrow=True requires pyarrow to be installed")
+    if dedup_strategy not in ('auto', 'hash', 'sort'):
+        raise ValueError(f"Unknown dedup_strategy: {dedup_strategy!r}")
+    
     # Remove output file if it exists
     if os.path.exists(output_file):
         os.remove(output_file)
@@ -32,46 +99,48 @@ def process_csv_in_chunks(
     print(dedup_columns)
     if dedup_columns:
         print(f"Global deduplication will be performed on columns: {dedup_columns}")
+        if dedup_strategy == 'auto':
+            dedup_strategy = _choose_dedup_strategy(input_file, transform_function, dedup_columns, dtype_map)
+            print(f"Using {dedup_strategy} deduplication")
+        
         # Use deduplication-aware processing
-        _process_with_deduplication(input_file, output_file, transform_function, chunk_size, write_header, dedup_columns)
+        if dedup_strategy == 'sort':
+            _process_with_sort_deduplication(input_file, output_file, transform_function, chunk_size, write_header, dedup_columns, use_arrow, dtype_map, max_workers)
+        else:
+            _process_with_deduplication(input_file, output_file, transform_function, chunk_size, write_header, dedup_columns, use_arrow, dtype_map, max_workers)
     else:
         # Use original processing logic
-        _process_without_deduplication(input_file, output_file, transform_function, chunk_size, write_header)
+        _process_without_deduplication(input_file, output_file, transform_function, chunk_size, write_header, use_arrow, dtype_map, max_workers)
 
 def _process_without_deduplication(
     input_file: str,
     output_file: str,
     transform_function: Callable[[pd.DataFrame], pd.DataFrame],
     chunk_size: int,
-    write_header: bool
+    write_header: bool,
+    use_arrow: bool = False,
+    dtype_map: Optional[dict] = None,
+    max_workers: int = 1
 ) -> None:
     """processing logic without deduplication"""
     first_chunk = True
     total_rows_processed = 0
+    last_progress = time.monotonic()
     
     try:
-        # Read CSV in chunks
-        for chunk_df in pd.read_csv(input_file, chunksize=chunk_size):
-            # Apply transformations
-            transformed_chunk = transform_function(chunk_df)
-            
-            # Write to output file
-            mode = 'w' if first_chunk else 'a'
-            header = write_header and first_chunk
-            
-            transformed_chunk.to_csv(
-                output_file, 
-                mode=mode, 
-                header=header, 
-                index=False
-            )
-            
-            total_rows_processed += len(chunk_df)
-            first_chunk = False
-            
-            # Optional: Print progress
-            if total_rows_processed % 50000 == 0:
-                print(f"Processed {total_rows_processed} rows...")
+        with _open_output(output_file, use_arrow) as out:
+            for rows_read, transformed_chunk in _stream_transformed_chunks(
+                input_file, transform_function, chunk_size, use_arrow, dtype_map, max_workers
+            ):
+                # Write to output file
+                header = write_header and first_chunk
+                _write_chunk(transformed_chunk, out, header, use_arrow)
+                
+                total_rows_processed += rows_read
+                first_chunk = False
+                
+                # Optional: Print progress, at most once per PROGRESS_INTERVAL_SECONDS
+                last_progress = _report_progress(total_rows_processed, last_progress)
     
     except Exception as e:
         print(f"Error processing file: {e}")
@@ -85,124 +154,391 @@ def _process_with_deduplication(
     transform_function: Callable[[pd.DataFrame], pd.DataFrame],
     chunk_size: int,
     write_header: bool,
-    dedup_columns: list
+    dedup_columns: list,
+    use_arrow: bool = False,
+    dtype_map: Optional[dict] = None,
+    max_workers: int = 1
 ) -> None:
-    """Processing logic with global deduplication"""
+    """Processing logic with global deduplication: read -> transform -> dedup -> write in one pass"""
     
-    # Step 1: Apply transformations and create temporary transformed file
-    temp_transformed_file = input_file + '.temp_transformed.csv'
-    print("Step 1: Applying transformations...")
+    # Hashes of every key combination written so far, across all chunks
+    seen_hashes = _SeenHashes()
     
     first_chunk = True
     total_rows_processed = 0
+    last_progress = time.monotonic()
+    total_rows_written = 0
     
     try:
-        for chunk_df in pd.read_csv(input_file, chunksize=chunk_size):
-            # Apply transformations (but skip deduplication in transform function)
-            transformed_chunk = transform_function(chunk_df, skip_deduplication=True)
-            
-            # Write transformed data to temp file
-            mode = 'w' if first_chunk else 'a'
-            header = write_header and first_chunk
-            
-            transformed_chunk.to_csv(
-                temp_transformed_file,
-                mode=mode,
-                header=header,
-                index=False
-            )
-            
-            total_rows_processed += len(chunk_df)
-            first_chunk = False
-            
-            if total_rows_processed % 50000 == 0:
-                print(f"Transformed {total_rows_processed} rows...")
+        with _open_output(output_file, use_arrow) as out:
+            # Transform with skip_deduplication, dedup is done here across all chunks
+            for rows_read, transformed_chunk in _stream_transformed_chunks(
+                input_file, transform_function, chunk_size, use_arrow, dtype_map, max_workers,
+                skip_deduplication=True
+            ):
+                # Keep only the first occurrence of each combination
+                filtered_chunk = _remove_duplicates_across_chunks(transformed_chunk, dedup_columns, seen_hashes)
+                
+                header = write_header and first_chunk
+                _write_chunk(filtered_chunk, out, header, use_arrow)
+                
+                total_rows_processed += rows_read
+                total_rows_written += len(filtered_chunk)
+                first_chunk = False
+                
+                last_progress = _report_progress(total_rows_processed, last_progress)
     
     except Exception as e:
-        print(f"Error during transformation: {e}")
-        # Clean up temp file
-        if os.path.exists(temp_transformed_file):
-            os.remove(temp_transformed_file)
+        print(f"Error processing file: {e}")
         raise
     
-    print(f"Transformation complete. {total_rows_processed} rows processed.")
+    print(f"Found {len(seen_hashes)} unique combinations")
+    print(f"Deduplication completed!! Total rows written: {total_rows_written}")
+    print("Processing with deduplication complete!")
+
+def _choose_dedup_strategy(
+    input_file: str,
+    transform_function: Callable[[pd.DataFrame], pd.DataFrame],
+    dedup_columns: list,
+    dtype_map: Optional[dict]
+) -> str:
+    """
+    Pick 'sort' when a sample of the file has almost no duplicate keys, 'hash' otherwise.
+    """
+    sample = transform_function(pd.read_csv(input_file, nrows=DEDUP_SAMPLE_ROWS, dtype=dtype_map), skip_deduplication=True)
+    hashes = _hash_dedup_keys(sample, dedup_columns)
+    if len(hashes) == 0:
+        return 'hash'
     
-    # Step 2: Perform global deduplication
-    print("Step 2: Performing global deduplication...")
-    _remove_duplicates_across_chunks(temp_transformed_file, output_file, dedup_columns, chunk_size)
+    duplicate_rate = pd.Index(hashes).duplicated().mean()
+    return 'sort' if duplicate_rate < SORT_DEDUP_MAX_DUPLICATE_RATE else 'hash'
+
+def _process_with_sort_deduplication(
+    input_file: str,
+    output_file: str,
+    transform_function: Callable[[pd.DataFrame], pd.DataFrame],
+    chunk_size: int,
+    write_header: bool,
+    dedup_columns: list,
+    use_arrow: bool = False,
+    dtype_map: Optional[dict] = None,
+    max_workers: int = 1
+) -> None:
+    """
+    Processing logic with global deduplication by sorting instead of a seen-set, in two passes:
+    the first collects every row's key hash and finds the first row of each key with one
+    vectorized np.unique, the second transforms the input again and writes only those rows.
+    Only the hashes (8 bytes per row) and one chunk are held at a time; nothing is spilled to disk.
+    """
+    total_rows_processed = 0
+    last_progress = time.monotonic()
     
-    # Step 3: Clean up temp file
-    if os.path.exists(temp_transformed_file):
-        os.remove(temp_transformed_file)
+    try:
+        # Pass 1: the key hash of every transformed row, in input order
+        chunk_hashes = []
+        for rows_read, transformed_chunk in _stream_transformed_chunks(
+            input_file, transform_function, chunk_size, use_arrow, dtype_map, max_workers,
+            skip_deduplication=True
+        ):
+            chunk_hashes.append(_hash_dedup_keys(transformed_chunk, dedup_columns))
+            total_rows_processed += rows_read
+            last_progress = _report_progress(total_rows_processed, last_progress)
+        
+        # np.unique sorts stably, so return_index gives the first row of every key
+        hashes = np.concatenate(chunk_hashes) if chunk_hashes else np.empty(0, dtype=np.uint64)
+        _, first_rows = np.unique(hashes, return_index=True)
+        rows_to_keep = np.zeros(len(hashes), dtype=bool)
+        rows_to_keep[first_rows] = True
+        
+        print(f"Found {len(first_rows)} unique combinations")
+        
+        # Pass 2: transform again and write the first occurrences, chunk by chunk in input order
+        first_chunk = True
+        total_rows_written = 0
+        row_offset = 0
+        with _open_output(output_file, use_arrow) as out:
+            for _, transformed_chunk in _stream_transformed_chunks(
+                input_file, transform_function, chunk_size, use_arrow, dtype_map, max_workers,
+                skip_deduplication=True
+            ):
+                filtered_chunk = transformed_chunk.iloc[rows_to_keep[row_offset:row_offset + len(transformed_chunk)]]
+                
+                header = write_header and first_chunk
+                _write_chunk(filtered_chunk, out, header, use_arrow)
+                
+                row_offset += len(transformed_chunk)
+                total_rows_written += len(filtered_chunk)
+                first_chunk = False
+    
+    except Exception as e:
+        print(f"Error processing file: {e}")
+        raise
     
+    print(f"Deduplication completed!! Total rows written: {total_rows_written}")
     print("Processing with deduplication complete!")
 
-def _remove_duplicates_across_chunks(input_file: str, output_file: str, dedup_columns: list, chunk_size: int) -> None:
+def _report_progress(total_rows_processed: int, last_progress: float) -> float:
+    """
+    Write a progress line if PROGRESS_INTERVAL_SECONDS have passed since the last one.
+    Returns the time of the last line written.
+    """
+    now = time.monotonic()
+    if now - last_progress < PROGRESS_INTERVAL_SECONDS:
+        return last_progress
+    # No flush: the line goes out with the next buffer write
+    sys.stdout.write(f"Processed {total_rows_processed} rows...\n")
+    return now
+
+def _stream_transformed_chunks(
+    input_file: str,
+    transform_function: Callable[[pd.DataFrame], pd.DataFrame],
+    chunk_size: int,
+    use_arrow: bool,
+    dtype_map: Optional[dict],
+    max_workers: int = 1,
+    **transform_kwargs
+) -> Iterator[Tuple[int, pd.DataFrame]]:
     """
-    Remove duplicates based on specified columns across entire CSV file when processing in chunks.
+    Read and transform the input one chunk at a time.
+    Yields (number of rows read, transformed chunk) in input order so callers can dedup/write as the data streams through.
     """
+    chunks = _read_chunks(input_file, chunk_size, use_arrow, dtype_map)
     
-    # Step 1: First pass - collect all unique combinations
-    seen_combinations = set()
-    first_occurrence_indices = {}  # Maps combination to (chunk_num, row_in_chunk)
+    if max_workers <= 1:
+        for chunk_df in chunks:
+            rows_read = len(chunk_df)
+            yield rows_read, transform_function(chunk_df, **transform_kwargs)
+        return
     
-    print("First pass: Identifying unique combinations...")
+    # Chunks don't depend on each other, so transform them in worker processes.
+    # Only a couple of chunks per worker are read ahead, so memory stays bounded.
+    # Workers are spawned, not forked: forking after numba's or Arrow's thread pools have started can deadlock.
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        pending = deque()
+        for chunk_df in chunks:
+            pending.append((len(chunk_df), executor.submit(transform_function, chunk_df, **transform_kwargs)))
+            if len(pending) >= 2 * max_workers:
+                rows_read, future = pending.popleft()
+                yield rows_read, future.result()
+        
+        while pending:
+            rows_read, future = pending.popleft()
+            yield rows_read, future.result()
+
+def _read_chunks(input_file: str, chunk_size: int, use_arrow: bool, dtype_map: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the input CSV as a stream of DataFrames, using Arrow's multithreaded
+    streaming reader when use_arrow is set.
+    """
+    if not use_arrow:
+        # Map the file instead of copying it through Python-side read buffers
+        yield from pd.read_csv(input_file, chunksize=chunk_size, dtype=dtype_map, memory_map=True, low_memory=False)
+        return
     
-    chunk_reader = pd.read_csv(input_file, chunksize=chunk_size)
+    read_options = pa_csv.ReadOptions(block_size=chunk_size * ARROW_BYTES_PER_ROW)
+    # Empty cells must be null, as with pandas, so RemoveEmptyRows still drops them
+    convert_options = pa_csv.ConvertOptions(
+        column_types=_arrow_column_types(dtype_map or {}),
+        strings_can_be_null=True
+    )
+    reader = pa_csv.open_csv(input_file, read_options=read_options, convert_options=convert_options)
+    for batch in reader:
+        # Only convert to pandas here, right before the transform needs it
+        yield pa.Table.from_batches([batch]).to_pandas(split_blocks=True, self_destruct=True)
+
+def _arrow_column_types(dtype_map: dict) -> dict:
+    """Translate a pandas dtype mapping into Arrow column types for the CSV reader."""
+    column_types = {}
+    for col, dtype in dtype_map.items():
+        if str(dtype) == 'category':
+            column_types[col] = pa.dictionary(pa.int32(), pa.string())
+        elif dtype in (str, object) or str(dtype) in ('str', 'object', 'string'):
+            column_types[col] = pa.string()
+        else:
+            column_types[col] = pa.from_numpy_dtype(np.dtype(dtype))
+    return column_types
+
+def infer_narrow_dtypes(sample: pd.DataFrame) -> dict:
+    """
+    Work out a narrow integer dtype for each whole-number column of a sample,
+    e.g. infer_narrow_dtypes(pd.read_csv(input_file, nrows=10_000)).
     
-    for chunk_num, chunk in enumerate(chunk_reader):
-        if chunk_num % 10 == 0:
-            print(f"Processing chunk {chunk_num + 1} for duplicate detection...")
-        
-        for idx, row in chunk.iterrows():
-            # Create combination tuple from specified columns
-            combination = tuple(row[col] for col in dedup_columns if col in chunk.columns) #this give the combination of the cols given for identifying the duplicates. for example, Name, Grade i.e., Frank Jones,11
+    Only integer columns without missing values are narrowed: to one size above the smallest
+    that fits the sample's min/max, so later values may be well outside the sample's range.
+    A value beyond even that is NOT an error with the pandas reader, it silently wraps around
+    (300 read as int8 gives 44); Arrow raises instead. Sample enough rows.
+    Price and quantity are never narrowed, as they are multiplied together.
+    Float and text columns are left to the reader's defaults.
+    """
+    dtype_map = {}
+    for col in sample.columns:
+        values = sample[col]
+        if str(col).lower() in ARITHMETIC_COLUMNS:
+            continue
+        if pd.api.types.is_integer_dtype(values) and not values.isna().any():
+            fitting = pd.to_numeric(values, downcast='integer').dtype.name
+            dtype_map[col] = _WIDER_INT_DTYPE.get(fitting, fitting)
+    return dtype_map
 
-            #check if this combination has been noted into the seen_combination, if present then skip adding, otherwise add this combination
-            #ex. if Frank Jones,11 is already present in seen_combinations then it won't add again
-            if combination not in seen_combinations:
-                seen_combinations.add(combination)
-                first_occurrence_indices[combination] = (chunk_num, idx % chunk_size)
+def _open_output(output_file: str, use_arrow: bool) -> IO:
+    """Open the output file once for the whole run; Arrow's CSV writer needs a binary handle."""
+    if use_arrow:
+        return open(output_file, 'wb')
+    return open(output_file, 'w', newline='')
+
+def _write_chunk(df: pd.DataFrame, out: IO, header: bool, use_arrow: bool) -> None:
+    """Append one chunk to an open output file."""
+    if not use_arrow:
+        df.to_csv(out, header=header, index=False)
+        return
     
-    print(f"Found {len(seen_combinations)} unique combinations")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    write_options = pa_csv.WriteOptions(include_header=header)
+    pa_csv.write_csv(table, out, write_options=write_options)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _fxhash_rows(cols_2d: np.ndarray) -> np.ndarray:
+        """Fold each row of a (rows, columns) uint64 array into one uint64 hash."""
+        out = np.empty(cols_2d.shape[0], dtype=np.uint64)
+        for i in prange(cols_2d.shape[0]):
+            h = np.uint64(0)
+            for j in range(cols_2d.shape[1]):
+                h = (h ^ cols_2d[i, j]) * FXHASH_MULTIPLIER
+            out[i] = h
+        return out
+else:
+    def _fxhash_rows(cols_2d: np.ndarray) -> np.ndarray:
+        """Fold each row of a (rows, columns) uint64 array into one uint64 hash."""
+        h = np.zeros(cols_2d.shape[0], dtype=np.uint64)
+        for j in range(cols_2d.shape[1]):
+            h = (h ^ cols_2d[:, j]) * FXHASH_MULTIPLIER
+        return h
+
+def _normalize_key_column(values: pd.Series) -> pd.Series:
+    """
+    Bring a numeric key column to one dtype, so e.g. 11 and 11.0 hash the same whatever dtype
+    a chunk was inferred as. Integers stay integers: large ids must not lose precision.
+    Floats that are all whole numbers become nullable Int64, which hashes its values like int64
+    and missing values as their own sentinel, so one empty cell doesn't change the other rows' hashes.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return values
     
-    # Step 2: Second pass - write only first occurrences to output file
-    print("Second pass: Writing deduplicated data.")
+    if pd.api.types.is_signed_integer_dtype(values):
+        return values.astype('int64')
     
-    chunk_reader = pd.read_csv(input_file, chunksize=chunk_size)
-    first_chunk = True
-    total_rows_written = 0
+    if pd.api.types.is_float_dtype(values):
+        numbers = values.to_numpy(dtype='float64', na_value=np.nan)
+        numbers = numbers[~np.isnan(numbers)]
+        whole = np.isfinite(numbers).all() and (numbers == np.floor(numbers)).all()
+        if whole and (np.abs(numbers) < 2.0 ** 63).all():
+            return values.astype('Int64')
     
-    for chunk_num, chunk in enumerate(chunk_reader):
-        # Create mask for rows to keep (first occurrences only)
-        rows_to_keep = []
-        
-        for idx, row in chunk.iterrows():
-            combination = tuple(row[col] for col in dedup_columns if col in chunk.columns)
-            expected_chunk, expected_idx = first_occurrence_indices[combination]
+    return values
+
+def _hash_dedup_keys(chunk: pd.DataFrame, dedup_columns: list) -> np.ndarray:
+    """
+    Return one uint64 hash per row of the dedup key columns.
+    """
+    keys = chunk[[col for col in dedup_columns if col in chunk.columns]]
+    
+    # Each column is hashed by value, so the same key gets the same hash in every chunk,
+    # then the per-row fold runs as one compiled loop instead of Python tuples
+    column_hashes = [
+        pd.util.hash_pandas_object(_normalize_key_column(keys[col]), index=False).to_numpy()
+        for col in keys.columns
+    ]
+    if not column_hashes:
+        return np.zeros(len(chunk), dtype=np.uint64)
+    return _fxhash_rows(np.ascontiguousarray(np.column_stack(column_hashes)))
+
+class _SeenHashes:
+    """
+    Set of uint64 key hashes kept as one sorted NumPy array: 8 bytes per key instead of a
+    Python int in a set, and membership for a whole chunk is a single searchsorted call.
+    """
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+    
+    def __len__(self):
+        return len(self.hashes)
+    
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Return a bool mask of which hashes are already in the set."""
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(self.hashes, hashes)
+        positions[positions == len(self.hashes)] = 0
+        return self.hashes[positions] == hashes
+    
+    def add(self, new_hashes: np.ndarray) -> None:
+        """Add hashes that are not in the set yet, keeping the array sorted."""
+        new_hashes = np.sort(new_hashes)
+        self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, new_hashes), new_hashes)
+
+def _remove_duplicates_across_chunks(chunk: pd.DataFrame, dedup_columns: list, seen_hashes: _SeenHashes) -> pd.DataFrame:
+    """
+    Remove rows whose dedup key combination was already seen in this or an earlier chunk.
+    seen_hashes is updated with the combinations kept from this chunk.
+    """
+    hashes = _hash_dedup_keys(chunk, dedup_columns)
+    
+    # First occurrence within this chunk (pandas' khash table), and not seen in any earlier chunk
+    rows_to_keep = ~pd.Index(hashes).duplicated(keep='first')
+    rows_to_keep &= ~seen_hashes.contains(hashes)
+    
+    seen_hashes.add(hashes[rows_to_keep])
+    # rows_to_keep is already a bool ndarray, so select positionally without pandas re-converting the mask
+    return chunk.iloc[rows_to_keep]
+
+@functools.lru_cache(maxsize=1)
+def _load_rules(rules_path: str, mtime: float) -> list:
+    """
+    Read the rules file once and return its rules as a list of dicts, in file order.
+    Each dict has a "kind" plus that rule's settings, e.g. {"kind": "average", "cols": ["math", "science", "english"]}.
+    mtime is only part of the cache key, so an edited rules file is read again.
+    """
+    reader = ExcelReader(rules_path)
+    data = reader.get_content()
+    
+    if data.empty:
+        print("The DataFrame is empty.")
+        return []
+    
+    # Check if all values in the DataFrame are NaN (null)
+    if data.isnull().all().all():
+        print("The DataFrame contains only null values.")
+        return []
+    
+    rules = []
+    for row in data.itertuples(index=False):
+        for value in row:
+            if pd.isna(value):
+                continue
             
-            # Keep row if this is its first occurrence
-            if chunk_num == expected_chunk and (idx % chunk_size) == expected_idx:
-                rows_to_keep.append(True)
-            else:
-                rows_to_keep.append(False)
-        
-        # Filter chunk to keep only first occurrences
-        filtered_chunk = chunk[rows_to_keep]
-        
-        if len(filtered_chunk) > 0:
-            # Write to output file
-            if first_chunk:
-                filtered_chunk.to_csv(output_file, index=False)
-                first_chunk = False
-            else:
-                filtered_chunk.to_csv(output_file, mode='a', header=False, index=False)
+            value = _WS_RE.sub('', str(value))
+            
+            if "Lowercase" in value:
+                rules.append({"kind": "lowercase"})
+            
+            if "DefaultDateFormat" in value:
+                rules.append({"kind": "date_format", "fmt": value.replace("DefaultDateFormat", "")})
             
-            total_rows_written += len(filtered_chunk)
-            if chunk_num % 10 == 0:
-                print(f"Chunk {chunk_num + 1}: Kept {len(filtered_chunk)} rows")
+            if "RemoveEmptyRows" in value:
+                rules.append({"kind": "remove_empty_rows"})
+            
+            if "Average" in value:
+                rules.append({"kind": "average", "cols": value.lower().replace("average", "").split("/")})
+            
+            if "Numeric" in value:
+                rules.append({"kind": "numeric", "cols": value.lower().replace("converttonumeric", "").split("/")})
+            
+            if "RemoveDuplicates" in value:
+                duplicate_columns = value.lower().replace("removeduplicates", "").split("/")
+                rules.append({"kind": "remove_duplicates", "cols": [col.strip() for col in duplicate_columns if col.strip()]})
     
-    print(f"Deduplication completed!! Total rows written: {total_rows_written}")
+    return rules
 
 def get_deduplication_columns() -> Optional[list]:
     """
@@ -210,28 +546,9 @@ def get_deduplication_columns() -> Optional[list]:
     Returns None if no deduplication is needed.
     """
     try:
-        reader = ExcelReader('C:\\Vincent\\Asset Project Learning - python\\CSVs\\Rules\\Rules.csv')
-        data = reader.get_content()
-        
-        if data.empty or data.isnull().all().all():
-            return None
-        
-        # Check for RemoveDuplicates rule
-        for row_index, row in data.iterrows():
-            for col_index, col in enumerate(data.columns):
-                value = row[col]
-                if pd.isna(value):
-                    continue
-                    
-                value = str(value).strip().replace(" ", "")
-                value = re.sub(r'\s+', '', value)
-                
-                if "RemoveDuplicates" in value:
-                    dupli_txt = value.lower()
-                    dupli_txt1 = dupli_txt.replace("removeduplicates", "")
-                    if dupli_txt1:
-                        duplicate_columns = dupli_txt1.split("/")
-                        return [col.strip() for col in duplicate_columns if col.strip()]
+        for rule in _load_rules(RULES_FILE_PATH, os.path.getmtime(RULES_FILE_PATH)):
+            if rule["kind"] == "remove_duplicates" and rule["cols"]:
+                return rule["cols"]
         
         return None
         
@@ -239,6 +556,20 @@ def get_deduplication_columns() -> Optional[list]:
         print(f"Error reading rules file: {e}")
         return None
 
+def _chunk_layout(df: pd.DataFrame) -> Tuple[list, bool]:
+    """
+    Return (string columns, whether price and quantity are present) for a chunk.
+    Worked out once per column/dtype layout and reused; dtypes are part of the key because
+    pandas infers them per chunk, e.g. an all-empty text column is float64 in one chunk.
+    """
+    key = (tuple(df.columns), tuple(df.dtypes))
+    layout = _CHUNK_LAYOUT_CACHE.get(key)
+    if layout is None:
+        string_cols = df.select_dtypes(include=['object', 'string']).columns.tolist()
+        layout = (string_cols, 'price' in df.columns and 'quantity' in df.columns)
+        _CHUNK_LAYOUT_CACHE[key] = layout
+    return layout
+
 def data_transformation(df: pd.DataFrame, skip_deduplication: bool = False) -> pd.DataFrame:
     """
     Transformation functionss
@@ -246,13 +577,16 @@ def data_transformation(df: pd.DataFrame, skip_deduplication: bool = False) -> p
     # Example transformations:
     
     # 1. Clean string columns (remove whitespace)
-    string_cols = df.select_dtypes(include=['object']).columns
-    for col in string_cols:
-        df[col] = df[col].astype(str).str.strip()
+    string_cols, has_price_and_quantity = _chunk_layout(df)
+    if string_cols:
+        df[string_cols] = df[string_cols].astype(STRING_DTYPE).apply(lambda s: s.str.strip())
     
     # 2. Add a new calculated column (example)
-    if 'price' in df.columns and 'quantity' in df.columns:
-        df['total_value'] = df['price'] * df['quantity']
+    if has_price_and_quantity:
+        # Plain arrays: no index alignment needed, both columns come from the same chunk.
+        # At least int64 for the product, so narrow inputs can't overflow
+        price, quantity = df['price'].to_numpy(), df['quantity'].to_numpy()
+        df['total_value'] = np.multiply(price, quantity, dtype=np.result_type(price, quantity, np.int64))
    
     # 3. Convert data types if needed
     #numeric_cols = ['price', 'quantity', 'total_value']
@@ -260,85 +594,111 @@ def data_transformation(df: pd.DataFrame, skip_deduplication: bool = False) -> p
     #    if col in df.columns:
     #        df[col] =   pd.to_numeric(df[col], errors='coerce')
 
-    # Are there custom Rules?    
-    reader = ExcelReader('C:\\Vincent\\Asset Project Learning - python\\CSVs\\Rules\\Rules.csv')
-    data = reader.get_content()
-        
-    if data.empty:
-        print("The DataFrame is empty.")
+    # Are there custom Rules? They are compiled once into a single function and reused for every chunk
+    apply_rules = _compile_rules(RULES_FILE_PATH, os.path.getmtime(RULES_FILE_PATH))
+    return apply_rules(df, skip_deduplication)
 
-    # Check if all values in the DataFrame are NaN (null)
-    elif data.isnull().all().all():
-        print("The DataFrame contains only null values.")
+def _rule_source(rule: dict) -> list:
+    """Return the lines of Python that apply one rule to df."""
+    kind = rule["kind"]
+    
+    if kind == "lowercase":
+        return ["df.columns = df.columns.str.lower().str.replace(' ', '_')"]
+    
+    if kind == "date_format":
+        return [
+            "df.columns = df.columns.str.strip()",
+            "if 'DateOfExam' in df.columns:",
+            f"    df['DateOfExam'] = _format_date_column(df['DateOfExam'], {rule['fmt']!r})",
+        ]
+    
+    if kind == "remove_empty_rows":
+        return ["df = df.dropna()"]
+    
+    if kind == "average":
+        return [
+            "df.columns = df.columns.str.strip()",
+            f"df['AverageMarks'] = df[{rule['cols']!r}].mean(axis=1).round(2)",
+        ]
+    
+    if kind == "numeric":
+        # Converting all the columns in one assign instead of one column write each
+        return [
+            f"df = df.assign(**{{col: pd.to_numeric(df[col], errors='coerce') for col in {rule['cols']!r} if col in df.columns}})"
+        ]
+    
+    if kind == "remove_duplicates":
+        # Don't perform deduplication here - it will be handled globally
+        return [
+            "if not skip_deduplication:",
+            "    print('Note: Deduplication will be handled globally across all chunks')",
+        ]
+    
+    return []
 
-    else:
-        #print("There are custom rules")
-        for row_index, row in data.iterrows():
-            for col_index, col in enumerate(data.columns):
-                value = row[col]
-                if pd.isna(value):
-                    continue
-                    
-                value = str(value).strip()
-                value = value.replace(" ", "")
-                value = re.sub(r'\s+', '', value)
-
-                if isinstance(value, str) and "Lowercase" in value:
-                    df.columns = df.columns.str.lower().str.replace(' ', '_')
-
-                if "DefaultDateFormat" in value:
-                    date_columns = ['order_date', 'created_date', 'delivery_date','dateofexam']  # Replace with your column names                   
-                    
-                    df.columns = df.columns.str.strip()
-                    print(df.columns.tolist())
-                    dateFormat = value.replace("DefaultDateFormat","")
-                    if 'DateOfExam' in df.columns:
-                        df['DateOfExam'] = df['DateOfExam'].apply(lambda x: format_if_date(x, dateFormat))
-
-                if isinstance(value, str) and "RemoveEmptyRows" in value:
-                    df = df.dropna()
-                
-                if "Average" in value:
-                    averageTxt = value.lower()
-                    averageTxt=averageTxt.replace("average","")
-                    averageParts = averageTxt.split("/")
-                    #print cols in df
-                    df.columns = df.columns.str.strip()
-                    df['AverageMarks'] = df[averageParts].mean(axis=1).round(2)
-                    
-                if "Numeric" in value:
-                    numericCols = value.lower()
-                    numericCols = numericCols.replace("converttonumeric","")
-                    numericColsArr = numericCols.split("/")
-                    #converting the columns into numeric
-                    for col in numericColsArr:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                # Modified deduplication logic - only apply if not skipping deduplication
-                if "RemoveDuplicates" in value and not skip_deduplication:
-                    print("Note: Deduplication will be handled globally across all chunks")
-                    # Don't perform deduplication here - it will be handled globally
-
-    return df
-
-def format_if_date(value, output_format):
-    try:
-        # Try parsing the value as a date
-        parsed = parse(str(value), fuzzy=False)
-        # Return formatted date
-        return parsed.strftime(output_format)
-    except (ValueError, TypeError):
-        # Not a date, return original value
-        return value
+def _batch_rules(rules: list) -> list:
+    """
+    Merge back-to-back rules that can run as one step: consecutive ConvertToNumeric rules become a
+    single conversion, and repeated RemoveEmptyRows a single dropna. Rule order is otherwise kept,
+    since e.g. Lowercase changes the column names later rules refer to.
+    """
+    batched = []
+    for rule in rules:
+        previous = batched[-1] if batched else None
+        if previous and previous["kind"] == rule["kind"] == "numeric":
+            merged_cols = previous["cols"] + [col for col in rule["cols"] if col not in previous["cols"]]
+            batched[-1] = {"kind": "numeric", "cols": merged_cols}
+        elif previous and previous["kind"] == rule["kind"] == "remove_empty_rows":
+            continue
+        else:
+            batched.append(rule)
+    return batched
+
+@functools.lru_cache(maxsize=1)
+def _compile_rules(rules_path: str, mtime: float) -> Callable[[pd.DataFrame, bool], pd.DataFrame]:
+    """
+    Specialize the rules into one straight-line function, apply_rules(df, skip_deduplication),
+    so chunks run plain pandas calls instead of re-interpreting the rules list.
+    Cached per rules file and modification time.
+    """
+    lines = ["def apply_rules(df, skip_deduplication):"]
+    for rule in _batch_rules(_load_rules(rules_path, mtime)):
+        lines.extend("    " + line for line in _rule_source(rule))
+    lines.append("    return df")
+    
+    namespace = {"pd": pd, "_format_date_column": _format_date_column}
+    exec(compile("\n".join(lines), f"<rules {rules_path}>", "exec"), namespace)
+    return namespace["apply_rules"]
+
+def _format_date_column(values: pd.Series, output_format: str) -> pd.Series:
+    """
+    Reformat every date in a column to output_format, leaving values that are not dates unchanged.
+    """
+    # Parse numbers such as 20250729 as text, otherwise pandas reads them as epoch nanoseconds
+    text = values
+    if not (pd.api.types.is_string_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+        text = values.astype(str)
+    
+    # Vectorized parse; the format is inferred from the first value and reused for the rest
+    parsed = pd.to_datetime(text, errors='coerce')
+    
+    # Dates written in some other format fall back to a per-value parse, only for those rows
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(text[failed], errors='coerce', format='mixed')
+    
+    # Not a date, keep original value
+    return parsed.dt.strftime(output_format).where(parsed.notna(), values)
 
 class ExcelReader:
     def __init__(self, file_path):
         self.file_path = file_path
 
     def get_content(self):
-        # Reads the Excel file and returns a DataFrame
-        return pd.read_csv(self.file_path)
+        # Reads the Excel file and returns a DataFrame, with Arrow's parser when it is installed
+        if pa is not None:
+            return pd.read_csv(self.file_path, engine='pyarrow')
+        return pd.read_csv(self.file_path, memory_map=True)
 
 # Example usage
 if __name__ == "__main__":
@@ -352,7 +712,8 @@ if __name__ == "__main__":
         input_file=input_file,
         output_file=output_file,
         transform_function=data_transformation,
-        chunk_size=50000  # Adjust based on your system's memory
+        chunk_size=50000,  # Adjust based on your system's memory
+        max_workers=os.cpu_count()  # Transform chunks on all cores
     )
     
     print(f"Processing complete! Output saved to: {output_file}")
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+
+import pandas as pd
+import pytest
+
+import ReadCSVFile
+
+
+def _use_rules(tmp_path, monkeypatch, rules):
+    """Point the module at a Rules.csv holding these rule rows and return its path."""
+    rules_file = tmp_path / "Rules.csv"
+    rules_file.write_text("Rule\tType\n" + "".join(rule + "\n" for rule in rules))
+    monkeypatch.setattr(ReadCSVFile, "RULES_FILE_PATH", str(rules_file))
+    return rules_file
+
+
+def test_dedup_keeps_distinct_large_integer_keys():
+    chunk = pd.DataFrame({"id": [9007199254740992, 9007199254740993]})
+    kept = ReadCSVFile._remove_duplicates_across_chunks(chunk, ["id"], ReadCSVFile._SeenHashes())
+    assert len(kept) == 2
+
+
+def test_dedup_matches_whole_floats_to_integers_across_chunks():
+    seen_hashes = ReadCSVFile._SeenHashes()
+    first = pd.DataFrame({"name": ["Frank Jones"], "grade": [11]})
+    second = pd.DataFrame({"name": ["Frank Jones"], "grade": [11.0]})
+    ReadCSVFile._remove_duplicates_across_chunks(first, ["name", "grade"], seen_hashes)
+    assert len(ReadCSVFile._remove_duplicates_across_chunks(second, ["name", "grade"], seen_hashes)) == 0
+    
+    # A missing grade elsewhere in the chunk makes it float64; 11.0 must still match 11
+    with_missing = pd.DataFrame({"name": ["Frank Jones", "Carl"], "grade": [11.0, float("nan")]})
+    kept = ReadCSVFile._remove_duplicates_across_chunks(with_missing, ["name", "grade"], seen_hashes)
+    assert kept["name"].tolist() == ["Carl"]
+
+
+def test_format_date_column_parses_numeric_dates_as_text():
+    values = pd.Series([20250729, 20250801])
+    formatted = ReadCSVFile._format_date_column(values, "%d/%m/%Y")
+    assert formatted.tolist() == ["29/07/2025", "01/08/2025"]
+
+
+def test_format_date_column_leaves_non_dates_unchanged():
+    values = pd.Series(["7/29/2025", "hello"])
+    formatted = ReadCSVFile._format_date_column(values, "%d/%m/%Y")
+    assert formatted.tolist() == ["29/07/2025", "hello"]
+
+
+def test_chunk_layout_rechecks_dtypes_per_chunk():
+    empty_chunk = pd.DataFrame({"name": [float("nan")], "age": [15]})
+    text_chunk = pd.DataFrame({"name": ["  Bob  "], "age": [15]})
+    assert ReadCSVFile._chunk_layout(empty_chunk)[0] == []
+    assert ReadCSVFile._chunk_layout(text_chunk)[0] == ["name"]
+
+
+def test_arrow_reader_reads_empty_strings_as_missing(tmp_path):
+    pytest.importorskip("pyarrow")
+    input_file = tmp_path / "students.csv"
+    input_file.write_text("Name,Age\nFrank Jones,14\n,15\n")
+    chunks = list(ReadCSVFile._read_chunks(str(input_file), 50000, use_arrow=True))
+    assert chunks[0]["Name"].isna().tolist() == [False, True]
+
+
+def test_arrow_reader_reads_mixed_column_as_text_with_dtype_map(tmp_path):
+    pytest.importorskip("pyarrow")
+    input_file = tmp_path / "students.csv"
+    input_file.write_text("Name,Age\n" + "A,14\n" * 5000 + "B,unknown\n")
+    # Small chunk_size -> small Arrow blocks, so "unknown" lands after the types are fixed
+    with pytest.raises(Exception, match="conversion error"):
+        list(ReadCSVFile._read_chunks(str(input_file), 10, use_arrow=True))
+    chunks = list(ReadCSVFile._read_chunks(str(input_file), 10, use_arrow=True, dtype_map={"Age": str}))
+    ages = pd.concat(chunks)["Age"]
+    assert len(ages) == 5001
+    assert ages.iloc[-1] == "unknown"
+
+def test_narrow_dtypes_leave_headroom_for_later_chunks(tmp_path):
+    input_file = tmp_path / "students.csv"
+    input_file.write_text("Age,price,quantity\n" + "15,10,20\n" * 100 + "300,10,20\n")
+    sample = pd.read_csv(input_file, nrows=100)
+    dtype_map = ReadCSVFile.infer_narrow_dtypes(sample)
+    assert dtype_map == {"Age": "int16"}
+    chunks = list(ReadCSVFile._read_chunks(str(input_file), 10, use_arrow=False, dtype_map=dtype_map))
+    assert chunks[-1]["Age"].tolist() == [300]
+
+def test_total_value_does_not_overflow_narrow_columns(tmp_path, monkeypatch):
+    _use_rules(tmp_path, monkeypatch, ["Lowercase\t"])
+    df = pd.DataFrame({"price": pd.array([10, 100], dtype="int8"), "quantity": pd.array([20, 100], dtype="int8")})
+    result = ReadCSVFile.data_transformation(df)
+    assert result["total_value"].tolist() == [200, 10000]
+
+@pytest.mark.parametrize("dedup_strategy", ["hash", "sort"])
+def test_dedup_strategies_keep_first_occurrence_in_input_order(tmp_path, monkeypatch, dedup_strategy):
+    _use_rules(tmp_path, monkeypatch, ["Lowercase\t", "RemoveDuplicates\tName/Grade"])
+    input_file = tmp_path / "students.csv"
+    input_file.write_text("Name,Grade,Math\nFrank,11,1\nBob,10,2\nFrank,11,3\nCarl,,4\nBob,10,5\nAnn,9,6\nCarl,,7\n")
+    output_file = tmp_path / "output.csv"
+    ReadCSVFile.process_csv_in_chunks(
+        str(input_file), str(output_file), ReadCSVFile.data_transformation,
+        chunk_size=2, dedup_strategy=dedup_strategy
+    )
+    assert output_file.read_text() == "name,grade,math\nFrank,11,1\nBob,10,2\nCarl,,4\nAnn,9,6\n"
+
+def test_rules_apply_in_file_order(tmp_path, monkeypatch):
+    # Average and ConvertToNumeric name the lowercased columns, so Lowercase has to run first
+    _use_rules(tmp_path, monkeypatch, ["Lowercase\t", "Average\tMath/Science", "ConvertToNumeric\tAge"])
+    df = pd.DataFrame({"Name": ["Ann"], "Age": ["15"], "Math": [80], "Science": [91]})
+    result = ReadCSVFile.data_transformation(df)
+    assert result.columns.tolist() == ["name", "age", "math", "science", "AverageMarks"]
+    assert result["AverageMarks"].tolist() == [85.5]
+    assert result["age"].tolist() == [15]
+
+def test_back_to_back_numeric_rules_are_merged(tmp_path, monkeypatch):
+    rules_file = _use_rules(tmp_path, monkeypatch, ["ConvertToNumeric\tAge", "ConvertToNumeric\tGrade/Age", "Lowercase\t"])
+    rules = ReadCSVFile._load_rules(str(rules_file), rules_file.stat().st_mtime)
+    assert ReadCSVFile._batch_rules(rules) == [{"kind": "numeric", "cols": ["age", "grade"]}, {"kind": "lowercase"}]
+
+def test_edited_rules_file_is_picked_up(tmp_path, monkeypatch):
+    rules_file = _use_rules(tmp_path, monkeypatch, ["Lowercase\t"])
+    assert ReadCSVFile.data_transformation(pd.DataFrame({"Name": ["Ann"]})).columns.tolist() == ["name"]
+    
+    rules_file.write_text("Rule\tType\nRemoveEmptyRows\t\n")
+    mtime = rules_file.stat().st_mtime + 10
+    os.utime(rules_file, (mtime, mtime))
+    result = ReadCSVFile.data_transformation(pd.DataFrame({"Name": ["Ann", None]}))
+    assert result.columns.tolist() == ["Name"]
+    assert len(result) == 1